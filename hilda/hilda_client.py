@@ -52,6 +52,12 @@ except ImportError:
 
 hilda_art = Path(__file__).resolve().parent.joinpath('hilda_ascii_art.html').read_text()
 
+OBJECTIVE_C_ROOT = Path(__file__).resolve().parent / 'objective_c'
+LSOF_CODE = (OBJECTIVE_C_ROOT / 'lsof.m').read_text()
+TO_NS_FROM_JSON_CODE = (OBJECTIVE_C_ROOT / 'to_ns_from_json.m').read_text()
+FROM_NS_TO_JSON_CODE = (OBJECTIVE_C_ROOT / 'from_ns_to_json.m').read_text()
+CLASS_BY_MODULE_CODE = (OBJECTIVE_C_ROOT / 'get_objectivec_class_by_module.m').read_text()
+
 GREETING = f"""
 {hilda_art}
 
@@ -159,6 +165,9 @@ class HildaClient:
         self.symbols = SymbolsJar.create(self)
         self.breakpoints = {}
         self.captured_objects = {}
+        # keystone encodings by assembly text, for `poke_text` calls repeating the same code (e.g. re-applying a patch
+        # from the shell)
+        self._assembled_code_cache = {}
         self.registers = Registers(self)
         self.arch = self.target.GetTriple().split('-')[0]
         self.ui_manager = UiManager(self)
@@ -166,7 +175,6 @@ class HildaClient:
         self._dynamic_env_loaded = False
         self._symbols_loaded = False
         self.globals: typing.MutableMapping[str, Any] = globals()
-        self._hilda_root = Path(__file__).parent
 
         # the frame called within the context of the hit BP
         self._bp_frame = None
@@ -189,8 +197,7 @@ class HildaClient:
         Get dictionary of all open FDs
         :return: Mapping between open FDs and their paths
         """
-        data = (self._hilda_root / 'objective_c' / 'lsof.m').read_text()
-        result = json.loads(self.po(data))
+        result = json.loads(self.po(LSOF_CODE))
         # convert FDs into int
         return {int(k): v for k, v in result.items()}
 
@@ -325,7 +332,10 @@ class HildaClient:
         """
         if not lldb.KEYSTONE_SUPPORT:
             raise NotImplementedError('Not supported without keystone')
-        bytecode, count = self._ks.asm(code, as_bytes=True)
+        bytecode = self._assembled_code_cache.get(code)
+        if bytecode is None:
+            bytecode, count = self._ks.asm(code, as_bytes=True)
+            self._assembled_code_cache[code] = bytecode
         return self.poke(address, bytecode)
 
     @stop_is_needed
@@ -678,32 +688,54 @@ class HildaClient:
         :param options: can contain an `override` keyword to specify if to override an existing BP
         :return: native LLDB breakpoint
         """
-        if address_or_name in [bp.address for bp in self.breakpoints.values()]:
-            override = True if options.get('override', True) else False
-            if override or prompts.prompt_for_confirmation('A breakpoint already exist in given location. '
-                                                           'Would you like to delete the previous one?', True):
-                breakpoints = list(self.breakpoints.items())
-                for bp_id, bp in breakpoints:
-                    if address_or_name == bp.address:
+        return self.bulk_bp([(address_or_name, {})], callback, condition=condition, forced=forced, **options)[0]
+
+    def bulk_bp(self, locations: List[typing.Tuple[Union[int, str], typing.Mapping]],
+                callback: Optional[Callable] = None, condition: str = None, forced=False,
+                **options) -> List[HildaBreakpoint]:
+        """
+        Add a breakpoint on each of the given locations, looking up existing breakpoints only once
+        :param locations: list of (address_or_name, location_options) pairs. location_options are merged into options
+        :param callback: callback(hilda, *args) to be called
+        :param condition: set as a conditional breakpoint using lldb expression
+        :param forced: whether the breakpoints should be protected frm usual removal.
+        :param options: can contain an `override` keyword to specify if to override an existing BP
+        :return: list of the created breakpoints
+        """
+        existing_bp_ids = {}
+        for bp_id, bp in self.breakpoints.items():
+            existing_bp_ids.setdefault(bp.address, []).append(bp_id)
+
+        breakpoints = []
+        for address_or_name, location_options in locations:
+            bp_options = {**options, **location_options}
+
+            if address_or_name in existing_bp_ids:
+                override = True if bp_options.get('override', True) else False
+                if override or prompts.prompt_for_confirmation('A breakpoint already exist in given location. '
+                                                               'Would you like to delete the previous one?', True):
+                    for bp_id in existing_bp_ids.pop(address_or_name):
                         self.remove_hilda_breakpoint(bp_id)
 
-        if isinstance(address_or_name, int):
-            bp = self.target.BreakpointCreateByAddress(address_or_name)
-        elif isinstance(address_or_name, str):
-            bp = self.target.BreakpointCreateByName(address_or_name)
+            if isinstance(address_or_name, int):
+                bp = self.target.BreakpointCreateByAddress(address_or_name)
+            elif isinstance(address_or_name, str):
+                bp = self.target.BreakpointCreateByName(address_or_name)
 
-        if condition is not None:
-            bp.SetCondition(condition)
+            if condition is not None:
+                bp.SetCondition(condition)
 
-        # add into Hilda's internal list of breakpoints
-        self.breakpoints[bp.id] = HildaBreakpoint(self, bp, address=address_or_name, forced=forced, options=options,
-                                                  callback=callback)
+            # add into Hilda's internal list of breakpoints
+            self.breakpoints[bp.id] = HildaBreakpoint(self, bp, address=address_or_name, forced=forced,
+                                                      options=bp_options, callback=callback)
+            existing_bp_ids.setdefault(address_or_name, []).append(bp.id)
 
-        if callback is not None:
-            bp.SetScriptCallbackFunction('lldb.hilda_client.bp_callback_router')
+            if callback is not None:
+                bp.SetScriptCallbackFunction('lldb.hilda_client.bp_callback_router')
 
-        self.log_info(f'Breakpoint #{bp.id} has been set')
-        return self.breakpoints[bp.id]
+            self.log_info(f'Breakpoint #{bp.id} has been set')
+            breakpoints.append(self.breakpoints[bp.id])
+        return breakpoints
 
     def bp_callback_router(self, frame, bp_loc, *_):
         """
@@ -858,8 +890,7 @@ class HildaClient:
             json_data = json.dumps({'root': data}, default=self._to_ns_json_default)
         except TypeError as e:
             raise ConvertingToNsObjectError from e
-        obj_c_code = (self._hilda_root / 'objective_c' / 'to_ns_from_json.m').read_text()
-        expression = obj_c_code.replace('__json_object_dump__', json_data.replace('"', r'\"'))
+        expression = TO_NS_FROM_JSON_CODE.replace('__json_object_dump__', json_data.replace('"', r'\"'))
         try:
             return self.evaluate_expression(expression)
         except EvaluatingExpressionError as e:
@@ -871,9 +902,8 @@ class HildaClient:
         :param address: NS object.
         :return: Python object.
         """
-        obj_c_code = (self._hilda_root / 'objective_c' / 'from_ns_to_json.m').read_text()
         address = f'0x{address:x}' if isinstance(address, int) else address
-        expression = obj_c_code.replace('__ns_object_address__', address)
+        expression = FROM_NS_TO_JSON_CODE.replace('__ns_object_address__', address)
         try:
             json_dump = self.po(expression)
         except EvaluatingExpressionError as e:
@@ -1230,10 +1260,12 @@ class HildaClient:
     def _ks(self) -> Optional['Ks']:
         if not lldb.KEYSTONE_SUPPORT:
             return False
-        platforms = {'arm64': Ks(KS_ARCH_ARM64, KS_MODE_LITTLE_ENDIAN),
-                     'arm64e': Ks(KS_ARCH_ARM64, KS_MODE_LITTLE_ENDIAN),
-                     'x86_64h': Ks(KS_ARCH_X86, KS_MODE_64)}
-        return platforms.get(self.arch)
+        platforms = {'arm64': (KS_ARCH_ARM64, KS_MODE_LITTLE_ENDIAN),
+                     'arm64e': (KS_ARCH_ARM64, KS_MODE_LITTLE_ENDIAN),
+                     'x86_64h': (KS_ARCH_X86, KS_MODE_64)}
+        # only initialize the assembler of the current arch
+        platform = platforms.get(self.arch)
+        return None if platform is None else Ks(*platform)
 
     def _get_module_class_list(self, module_name: str):
         for m in self.target.module_iter():
@@ -1241,8 +1273,7 @@ class HildaClient:
                 continue
             objc_classlist = m.FindSection('__DATA').FindSubSection('__objc_classlist')
             objc_classlist_addr = self.symbol(objc_classlist.GetLoadAddress(self.target))
-            obj_c_code = (self._hilda_root / 'objective_c' / 'get_objectivec_class_by_module.m').read_text()
-            obj_c_code = obj_c_code.replace('__count_objc_class', f'{objc_classlist.size // 8}').replace(
+            obj_c_code = CLASS_BY_MODULE_CODE.replace('__count_objc_class', f'{objc_classlist.size // 8}').replace(
                 '__objc_class_list',
                 f'{objc_classlist_addr}')
             return json.loads(self.po(obj_c_code))
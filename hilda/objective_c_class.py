@@ -1,13 +1,12 @@
-import json
-import time
+import sys
 from collections import namedtuple
-from dataclasses import dataclass, field
-from functools import partial
-from typing import Any
+from functools import lru_cache, partial
+from pathlib import Path
+from threading import Event
 from uuid import uuid4
 
-from objc_types_decoder.decode import decode as decode_type
-from objc_types_decoder.decode import decode_with_tail
+from objc_types_decoder.decode import decode as _decode_type
+from objc_types_decoder.decode import decode_with_tail as _decode_with_tail
 from pygments import highlight
 from pygments.formatters import TerminalTrueColorFormatter
 from pygments.lexers import ObjectiveCLexer
@@ -15,54 +14,119 @@ from pygments.lexers import ObjectiveCLexer
 from hilda.exceptions import GettingObjectiveCClassError
 from hilda.symbols_jar import SymbolsJar
 
+try:
+    # Class and symbol descriptions can be large JSON payloads, prefer a native parser when available
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 Ivar = namedtuple('Ivar', 'name type_ offset')
 Property = namedtuple('Property', 'name attributes')
 PropertyAttributes = namedtuple('PropertyAttributes', 'synthesize type_ list')
 
+OBJECTIVE_C_ROOT = Path(__file__).parent / 'objective_c'
+CLASS_DESCRIPTION_CODE = (OBJECTIVE_C_ROOT / 'get_objectivec_class_description.m').read_text()
 
-def convert_encoded_property_attributes(encoded):
-    conversions = {
-        'R': lambda x: 'readonly',
-        'C': lambda x: 'copy',
-        '&': lambda x: 'strong',
-        'N': lambda x: 'nonatomic',
-        'G': lambda x: 'getter=' + x[1:],
-        'S': lambda x: 'setter=' + x[1:],
-        'd': lambda x: 'dynamic',
-        'W': lambda x: 'weak',
-        'P': lambda x: '<garbage-collected>',
-        't': lambda x: 'encoding=' + x[1:],
-    }
+OBJC_LEXER = ObjectiveCLexer()
+OBJC_FORMATTER = TerminalTrueColorFormatter(style='native')
+
+# The same handful of type encodings recur across every ivar, property and method of every class
+decode_type = lru_cache(maxsize=8192)(_decode_type)
+decode_with_tail = lru_cache(maxsize=8192)(_decode_with_tail)
+
+
+# Attribute code -> (description, whether the attribute's value is appended to the description)
+PROPERTY_ATTRIBUTES_CONVERSIONS = {
+    'R': ('readonly', False),
+    'C': ('copy', False),
+    '&': ('strong', False),
+    'N': ('nonatomic', False),
+    'G': ('getter=', True),
+    'S': ('setter=', True),
+    'd': ('dynamic', False),
+    'W': ('weak', False),
+    'P': ('<garbage-collected>', False),
+    't': ('encoding=', True),
+}
 
+# ASCII table indexed by the attribute's first character, so each attribute costs a list lookup instead of a hash
+_PROPERTY_ATTRIBUTES_DISPATCH = [PROPERTY_ATTRIBUTES_CONVERSIONS.get(chr(i)) for i in range(128)]
+
+
+def convert_encoded_property_attributes(encoded):
     type_, tail = decode_with_tail(encoded[1:])
     attributes = []
     synthesize = None
-    for attr in filter(None, tail.lstrip(',').split(',')):
-        if attr[0] in conversions:
-            attributes.append(conversions[attr[0]](attr))
+    for attr in tail.split(','):
+        if not attr:
+            # the tail starts with a separator, or is empty altogether
+            continue
+        code = ord(attr[0])
+        conversion = _PROPERTY_ATTRIBUTES_DISPATCH[code] if code < 128 else None
+        if conversion is not None:
+            description, has_value = conversion
+            attributes.append(description + attr[1:] if has_value else description)
         elif attr[0] == 'V':
             synthesize = attr[1:]
 
     return PropertyAttributes(type_=type_, synthesize=synthesize, list=attributes)
 
 
-@dataclass
+def print_objc_code(code: str) -> None:
+    """
+    Print ObjectiveC code, highlighted only when printing to a terminal.
+    :param code: Code to print.
+    """
+    if sys.stdout.isatty():
+        code = highlight(code, OBJC_LEXER, OBJC_FORMATTER)
+    print(code)
+
+
+def _map_python_names_to_selectors(methods) -> dict:
+    """
+    Map the python names of the given methods to their selectors.
+    Several selectors may share a python name, in which case the one `Class.sanitize_name` produces wins.
+    """
+    selectors = {}
+    for method in methods:
+        python_name = method.python_name
+        if python_name in selectors and selectors[python_name] == Class.sanitize_name(python_name):
+            continue
+        selectors[python_name] = method.name
+    return selectors
+
+
 class Method:
-    name: str
-    client: Any = field(compare=False)
-    address: int = field(compare=False)
-    imp: int = field(compare=False)
-    type_: str = field(compare=False)
-    return_type: str = field(compare=False)
-    is_class: bool = field(compare=False)
-    args_types: list = field(compare=False)
+    __slots__ = ('name', 'client', 'address', 'imp', 'type_', 'is_class', 'python_name', 'class_', '_return_type',
+                 '_raw_return_type', '_args_types', '_raw_args_types', '_str')
+
+    def __init__(self, name: str, client, address: int, imp: int, type_: str, return_type: str, is_class: bool,
+                 args_types: list, raw_return_type: str = None, raw_args_types: list = None, class_=None):
+        self.name = name
+        self.client = client
+        # the Class listing this method, if any, whose symbols jar follows implementation changes
+        self.class_ = class_
+        self.address = address
+        self.imp = imp
+        self.type_ = type_
+        self.is_class = is_class
+        # name as exposed to python attribute access and autocompletion
+        self.python_name = name.replace(':', '_')
+        # the raw encodings are only decoded once the types are accessed
+        self._return_type = return_type
+        self._raw_return_type = raw_return_type
+        self._args_types = args_types
+        self._raw_args_types = raw_args_types
+        # description is built lazily, since most methods are never printed
+        self._str = None
 
     @staticmethod
-    def from_data(data: dict, client):
+    def from_data(data: dict, client, class_=None):
         """
         Create Method object from raw data.
         :param data: Data as loaded from get_objectivec_symbol_data.m.
         :param hilda.hilda_client.HildaClient client: Hilda client.
+        :param Class class_: Class listing the method.
         """
         return Method(
             name=data['name'],
@@ -70,23 +134,54 @@ class Method:
             address=client.symbol(data['address']),
             imp=client.symbol(data['imp']),
             type_=data['type'],
-            return_type=decode_type(data['return_type']),
+            return_type=None,
             is_class=data['is_class'],
-            args_types=list(map(decode_type, data['args_types']))
+            args_types=None,
+            raw_return_type=data['return_type'],
+            raw_args_types=data['args_types'],
+            class_=class_,
         )
 
+    @property
+    def return_type(self) -> str:
+        if self._return_type is None and self._raw_return_type is not None:
+            self._return_type = decode_type(self._raw_return_type)
+        return self._return_type
+
+    @property
+    def args_types(self) -> list:
+        if self._args_types is None:
+            raw_args_types = self._raw_args_types
+            self._args_types = [decode_type(arg_type) for arg_type in raw_args_types] if raw_args_types else []
+        return self._args_types
+
+    def __eq__(self, other):
+        # methods are identified by their name alone
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.name == other.name
+
     def set_implementation(self, new_imp: int):
         self.client.symbols.method_setImplementation(self.address, new_imp)
         self.imp = self.client.symbol(new_imp)
+        if self.class_ is not None:
+            self.class_._update_symbols_jar(self)
 
     def __str__(self):
+        if self._str is not None:
+            return self._str
         if ':' in self.name:
             args_names = self.name.split(':')
             name = ' '.join(['{}:({})'.format(*arg) for arg in zip(args_names, self.args_types[2:])])
         else:
             name = self.name
         prefix = '+' if self.is_class else '-'
-        return f'{prefix} {name}; // 0x{self.address:x} (returns: {self.return_type})\n'
+        self._str = f'{prefix} {name}; // 0x{self.address:x} (returns: {self.return_type})\n'
+        return self._str
+
+    def __repr__(self):
+        prefix = '+' if self.is_class else '-'
+        return f'<{self.__class__.__name__} {prefix}{self.name} 0x{self.address:x}>'
 
 
 class Class(object):
@@ -101,12 +196,19 @@ class Class(object):
         """
         self._client = client
         self._class_object = class_object
+        self._class_method_cache = {}
         self.protocols = []
         self.ivars = []
         self.properties = []
         self.methods = []
+        self._methods_by_name = {}
+        self._selectors_by_python_name = {}
+        self._super_methods_cache = {}
+        self._super_selectors_by_python_name = None
+        self._symbols_jar = None
         self.name = ''
-        self.super = None
+        self._super = None
+        self._super_address = 0
         if class_data is None:
             self.reload()
         else:
@@ -119,9 +221,7 @@ class Class(object):
         :param hilda.hilda_client.HildaClient client: Hilda client.
         :param class_name: Class name.
         """
-        obj_c_code = (client._hilda_root / 'objective_c' / 'get_objectivec_class_description.m').read_text()
-        obj_c_code = obj_c_code.replace('__class_address__', '0').replace('__class_name__', class_name)
-        class_symbol = Class(client, class_data=json.loads(client.po(obj_c_code)))
+        class_symbol = Class(client, class_data=Class._fetch_class_data(client, class_name=class_name))
         if class_symbol.name != class_name:
             raise GettingObjectiveCClassError()
         return class_symbol
@@ -137,21 +237,28 @@ class Class(object):
             name = name.replace('_', ':')
         return name
 
+    @property
+    def super(self):
+        """
+        Get the super class, loading it on first access.
+        :return: Super class, or None for root classes.
+        """
+        if self._super is None and self._super_address:
+            self._super = Class(self._client, self._super_address)
+        return self._super
+
     def reload(self):
         """
         Reload class object data.
         Should be used whenever the class layout changes (for example, during method swizzling)
         """
-        obj_c_code = (self._client._hilda_root / 'objective_c' / 'get_objectivec_class_description.m').read_text()
-        obj_c_code = obj_c_code.replace('__class_address__', f'{self._class_object:d}')
-        obj_c_code = obj_c_code.replace('__class_name__', self.name)
-        self._load_class_data(json.loads(self._client.po(obj_c_code)))
+        self._load_class_data(self._fetch_class_data(self._client, self._class_object, self.name))
 
     def show(self):
         """
         Print to terminal the highlighted class description.
         """
-        print(highlight(str(self), ObjectiveCLexer(), TerminalTrueColorFormatter(style='native')))
+        print_objc_code(str(self))
 
     def objc_call(self, sel: str, *args):
         """
@@ -167,9 +274,7 @@ class Class(object):
         :param name: Method name.
         :return: Method.
         """
-        for method in self.methods:
-            if method.name == name:
-                return method
+        return self._methods_by_name.get(name)
 
     def capture_self(self, sync: bool = False):
         """
@@ -186,27 +291,31 @@ class Class(object):
         def hook(hilda, frame, bp_loc, options):
             hilda.log_info(f'self object has been captured from {options["name"]}')
             hilda.log_info('removing breakpoints')
-            for bp_id, bp in list(hilda.breakpoints.items()):
-                if 'group_uuid' in bp.options and bp.options.get('group_uuid', '') == options['group_uuid']:
+            for bp_id in group_bp_ids:
+                if bp_id in hilda.breakpoints:
                     hilda.remove_hilda_breakpoint(bp_id)
+            group_bp_ids.clear()
             captured = hilda.evaluate_expression('$arg1')
             captured = captured.objc_symbol
             hilda.captured_objects[options['name'].split(' ')[0].split('[')[1]] = captured
+            captured_event.set()
             hilda.cont()
 
         group_uuid = str(uuid4())
+        # ids of all breakpoints placed by this capture, so the hook doesn't have to scan every existing breakpoint
+        group_bp_ids = []
+        captured_event = Event()
 
-        for method in self.methods:
-            if not method.is_class:
-                # only instance methods are relevant for capturing self
-                method.imp.bp(hook, group_uuid=group_uuid,
-                              name=f'-[{class_name} {method.name}]')
+        # only instance methods are relevant for capturing self
+        breakpoints = self._client.bulk_bp([(method.imp, {'name': f'-[{class_name} {method.name}]'})
+                                            for method in self.methods if not method.is_class],
+                                           hook, group_uuid=group_uuid)
+        group_bp_ids.extend(bp.lldb_breakpoint.id for bp in breakpoints)
 
         if sync:
             self._client.cont()
             self._client.log_debug('Waiting for desired object to be captured...')
-            while class_name not in self._client.captured_objects:
-                time.sleep(1)
+            captured_event.wait()
 
             return self._client.captured_objects[class_name]
 
@@ -220,9 +329,8 @@ class Class(object):
         """
         Proxy for bp command.
         """
-        for method in self.methods:
-            kwargs['name'] = f'[{self.name} {method.name}]'
-            method.imp.bp(callback, **kwargs)
+        self._client.bulk_bp([(method.imp, {'name': f'[{self.name} {method.name}]'}) for method in self.methods],
+                             callback, **kwargs)
 
     def iter_supers(self):
         """
@@ -233,99 +341,151 @@ class Class(object):
             yield sup
             sup = sup.super
 
+    @staticmethod
+    def _fetch_class_data(client, class_object: int = 0, class_name: str = '') -> dict:
+        obj_c_code = CLASS_DESCRIPTION_CODE.replace('__class_address__', f'{class_object:d}')
+        obj_c_code = obj_c_code.replace('__class_name__', class_name)
+        return json_loads(client.po(obj_c_code))
+
+    def _super_methods_by_name(self, exclude_nsobject: bool = False) -> dict:
+        """
+        Get all methods inherited from the super classes, flattened once and cached until reload.
+        :param exclude_nsobject: Skip methods of NSObject.
+        :return: Mapping between method name and the method of the nearest super class implementing it.
+        """
+        super_methods = self._super_methods_cache.get(exclude_nsobject)
+        if super_methods is None:
+            super_methods = {}
+            for sup in self.iter_supers():
+                if exclude_nsobject and sup.name == 'NSObject':
+                    continue
+                for name, method in sup._methods_by_name.items():
+                    super_methods.setdefault(name, method)
+            self._super_methods_cache[exclude_nsobject] = super_methods
+        return super_methods
+
+    def _selector_for_python_name(self, name: str) -> str:
+        selector = self._selectors_by_python_name.get(name)
+        if selector is not None:
+            return selector
+        super_selectors = self._super_selectors_by_python_name
+        if super_selectors is None:
+            super_selectors = _map_python_names_to_selectors(self._super_methods_by_name().values())
+            self._super_selectors_by_python_name = super_selectors
+        selector = super_selectors.get(name)
+        if selector is not None:
+            return selector
+        # not a known method, keep the generic conversion so lookup errors show the expected selector
+        return self.sanitize_name(name)
+
+    def _cache_class_method(self, sel: str):
+        class_method = partial(self.objc_call, sel)
+        self._class_method_cache[sel] = class_method
+        return class_method
+
     def _load_class_data(self, data: dict):
-        self._class_object = self._client.symbol(data['address'])
-        self.super = Class(self._client, data['super']) if data['super'] else None
+        client = self._client
+        ivars_data, properties_data, methods_data = data['ivars'], data['properties'], data['methods']
+
+        self._class_method_cache.clear()
+        self._super_methods_cache.clear()
+        self._super_selectors_by_python_name = None
+        self._symbols_jar = None
+
+        self._class_object = client.symbol(data['address'])
+        # the super class is only loaded once accessed
+        self._super = None
+        self._super_address = data['super']
         self.name = data['name']
         self.protocols = data['protocols']
         self.ivars = [
             Ivar(name=ivar['name'], type_=decode_type(ivar['type']) if ivar['type'] else 'unknown_type_t',
                  offset=ivar['offset'])
-            for ivar in data['ivars']
+            for ivar in ivars_data
         ]
         self.properties = [
             Property(name=prop['name'], attributes=convert_encoded_property_attributes(prop['attributes']))
-            for prop in data['properties']
+            for prop in properties_data
         ]
-        self.methods = [Method.from_data(method, self._client) for method in data['methods']]
+        method_from_data = Method.from_data
+        self.methods = [method_from_data(method, client, self) for method in methods_data]
+        # reversed so the first method of each name wins, as class methods are listed before instance methods
+        self._methods_by_name = {method.name: method for method in reversed(self.methods)}
+        self._selectors_by_python_name = _map_python_names_to_selectors(self.methods)
 
     @property
     def symbols_jar(self) -> SymbolsJar:
         """ Get a SymbolsJar object for quick operations on all methods """
-        jar = SymbolsJar.create(self._client)
-
-        for m in self.methods:
-            jar[f'[{self.name} {m.name}]'] = m.imp
-
-        return jar
+        if self._symbols_jar is None:
+            jar = SymbolsJar.create(self._client)
+            for m in self.methods:
+                jar[f'[{self.name} {m.name}]'] = m.imp
+            self._symbols_jar = jar
+        # a copy, so callers modifying their jar don't modify the cached one
+        return self._symbols_jar.copy()
+
+    def _update_symbols_jar(self, method: Method) -> None:
+        # only the replaced implementation's entry changes, so the cached jar is kept
+        if self._symbols_jar is not None:
+            self._symbols_jar[f'[{self.name} {method.name}]'] = method.imp
 
     def __dir__(self):
         result = set()
 
         for method in self.methods:
             if method.is_class:
-                result.add(method.name.replace(':', '_'))
+                result.add(method.python_name)
 
-        for sup in self.iter_supers():
-            if self._client.configs.nsobject_exclusion and sup.name == 'NSObject':
-                continue
-            for method in sup.methods:
-                if method.is_class:
-                    result.add(method.name.replace(':', '_'))
+        for method in self._super_methods_by_name(self._client.configs.nsobject_exclusion).values():
+            if method.is_class:
+                result.add(method.python_name)
 
-        result.update(list(super(Class, self).__dir__()))
+        result.update(super(Class, self).__dir__())
         return list(result)
 
     def __str__(self):
         protocol_buf = f'<{",".join(self.protocols)}>' if self.protocols else ''
 
         if self.super is not None:
-            buf = f'@interface {self.name}: {self.super.name} {protocol_buf}\n'
+            buf = [f'@interface {self.name}: {self.super.name} {protocol_buf}\n']
         else:
-            buf = f'@interface {self.name} {protocol_buf}\n'
+            buf = [f'@interface {self.name} {protocol_buf}\n']
 
         # Add ivars
-        buf += '{\n'
+        buf.append('{\n')
         for ivar in self.ivars:
-            buf += f'\t{ivar.type_} {ivar.name}; // 0x{ivar.offset:x}\n'
-        buf += '}\n'
+            buf.append(f'\t{ivar.type_} {ivar.name}; // 0x{ivar.offset:x}\n')
+        buf.append('}\n')
 
         # Add properties
         for prop in self.properties:
-            buf += f'@property ({",".join(prop.attributes.list)}) {prop.attributes.type_} {prop.name};\n'
+            buf.append(f'@property ({",".join(prop.attributes.list)}) {prop.attributes.type_} {prop.name};\n')
 
             if prop.attributes.synthesize is not None:
-                buf += f'@synthesize {prop.name} = {prop.attributes.synthesize};\n'
+                buf.append(f'@synthesize {prop.name} = {prop.attributes.synthesize};\n')
 
         # Add methods
-        for method in self.methods:
-            buf += str(method)
+        buf.extend(map(str, self.methods))
 
-        buf += '@end'
-        return buf
+        buf.append('@end')
+        return ''.join(buf)
 
     def __repr__(self):
         return f'<objC Class "{self.name}">'
 
     def __getitem__(self, item):
-        for method in self.methods:
-            if method.name == item:
-                if method.is_class:
-                    return partial(self.objc_call, item)
-                else:
-                    raise AttributeError(f'{self.name} class has an instance method named {item}, '
-                                         f'not a class method')
-
-        for sup in self.iter_supers():
-            for method in sup.methods:
-                if method.name == item:
-                    if method.is_class:
-                        return partial(self.objc_call, item)
-                    else:
-                        raise AttributeError(f'{self.name} class has an instance method named {item}, '
-                                             f'not a class method')
-
-        raise AttributeError(f''''{self.name}' class has no attribute {item}''')
+        class_method = self._class_method_cache.get(item)
+        if class_method is not None:
+            return class_method
+
+        method = self._methods_by_name.get(item)
+        if method is None:
+            method = self._super_methods_by_name().get(item)
+        if method is None:
+            raise AttributeError(f''''{self.name}' class has no attribute {item}''')
+        if not method.is_class:
+            raise AttributeError(f'{self.name} class has an instance method named {item}, not a class method')
+        return self._cache_class_method(item)
 
     def __getattr__(self, item: str):
-        return self[self.sanitize_name(item)]
+        return self[self._selector_for_python_name(item)]
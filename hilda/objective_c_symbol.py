@@ -1,18 +1,18 @@
-import json
 from contextlib import suppress
 from dataclasses import dataclass
 from functools import partial
 
-from objc_types_decoder.decode import decode as decode_type
-from pygments import highlight
-from pygments.formatters import TerminalTrueColorFormatter
-from pygments.lexers import ObjectiveCLexer
-
 from hilda.exceptions import HildaException
-from hilda.objective_c_class import Class, Method, Property, convert_encoded_property_attributes
+from hilda.objective_c_class import OBJECTIVE_C_ROOT, Class, Method, Property, convert_encoded_property_attributes, \
+    decode_type, json_loads, print_objc_code
 from hilda.symbol import Symbol
 from hilda.symbols_jar import SymbolsJar
 
+SYMBOL_DATA_CODE = (OBJECTIVE_C_ROOT / 'get_objectivec_symbol_data.m').read_text()
+
+# Value masks for ivars of up to 16 bytes, indexed by the ivar size
+MASK_BY_SIZE = tuple((1 << (size * 8)) - 1 for size in range(17))
+
 
 class SettingIvarError(HildaException):
     """ Raise when trying to set an Ivar too early or when the Ivar doesn't exist. """
@@ -21,6 +21,9 @@ class SettingIvarError(HildaException):
 
 @dataclass
 class Ivar:
+    # `dataclass(slots=True)` requires python 3.10, so the slots are declared explicitly
+    __slots__ = ('name', 'value', 'type_', 'offset')
+
     name: str
     value: Symbol
     type_: str
@@ -47,6 +50,10 @@ class ObjectiveCSymbol(Symbol):
         symbol.properties = []  # type: List[Property]
         symbol.methods = []  # type: List[Method]
         symbol.class_ = None  # type: Optional[Class]
+        # name lookups, mutated in place since attribute assignments are sanitized once `class_` is set
+        symbol._ivars_by_name = {}  # type: Dict[str, int]
+        symbol._properties_by_name = {}  # type: Dict[str, Property]
+        symbol._symbols_jar = None  # type: Optional[SymbolsJar]
         symbol.reload()
         return symbol
 
@@ -57,11 +64,14 @@ class ObjectiveCSymbol(Symbol):
         self.ivars.clear()
         self.properties.clear()
         self.methods.clear()
+        self._ivars_by_name.clear()
+        self._properties_by_name.clear()
+        # bypass the ivar handling of `__setattr__`, which would sanitize the name into `_symbols:jar`
+        object.__setattr__(self, '_symbols_jar', None)
         self.class_ = None
 
-        obj_c_code = (self._client._hilda_root / 'objective_c' / 'get_objectivec_symbol_data.m').read_text()
-        obj_c_code = obj_c_code.replace('__symbol_address__', f'{self:d}')
-        data = json.loads(self._client.po(obj_c_code))
+        obj_c_code = SYMBOL_DATA_CODE.replace('__symbol_address__', f'{self:d}')
+        data = json_loads(self._client.po(obj_c_code))
 
         self._reload_ivars(data['ivars'])
         self._reload_properties(data['properties'])
@@ -77,10 +87,11 @@ class ObjectiveCSymbol(Symbol):
         Print to terminal the highlighted class description.
         :param recursive: Show methods of super classes.
         """
-        print(highlight(self._to_str(recursive), ObjectiveCLexer(), TerminalTrueColorFormatter(style='native')))
+        print_objc_code(self._to_str(recursive))
 
     def _reload_ivars(self, ivars_data):
         raw_ivars = sorted(ivars_data, key=lambda ivar: ivar['offset'])
+        symbol = self._client.symbol
         for i, ivar in enumerate(raw_ivars):
             ivar_type = ivar['type']
             if ivar_type:
@@ -91,82 +102,87 @@ class ObjectiveCSymbol(Symbol):
             if i < len(raw_ivars) - 1:
                 # The .fm file returns a 64bit value, regardless of the real size.
                 size = raw_ivars[i + 1]['offset'] - ivar['offset']
-                value = value & ((2 ** (size * 8)) - 1)
-            ivar_value = self._client.symbol(value)
+                value &= MASK_BY_SIZE[size] if size < len(MASK_BY_SIZE) else (1 << (size * 8)) - 1
+            ivar_value = symbol(value)
             self.ivars.append(Ivar(name=ivar['name'], type_=ivar_type, offset=ivar['offset'], value=ivar_value))
+            self._ivars_by_name.setdefault(ivar['name'], i)
 
     def _reload_properties(self, properties_data):
         for prop in properties_data:
             prop_attributes = convert_encoded_property_attributes(prop['attributes'])
             self.properties.append(Property(name=prop['name'], attributes=prop_attributes))
+            self._properties_by_name.setdefault(prop['name'], self.properties[-1])
 
     def _set_ivar(self, name, value):
         try:
             ivars = self.__getattribute__('ivars')
+            i = self.__getattribute__('_ivars_by_name').get(name)
             class_name = self.__getattribute__('class_').name
         except AttributeError as e:
             raise SettingIvarError from e
 
-        for i, ivar in enumerate(ivars):
-            if ivar.name == name:
-                size = self.item_size
-                if i < len(self.ivars) - 1:
-                    size = ivars[i + 1].offset - ivar.offset
-                with self.change_item_size(size):
-                    self[ivar.offset // size] = value
-                    ivar.value = value
-                return
-        raise SettingIvarError(f'Ivar "{name}" does not exist in "{class_name}"')
+        if i is None:
+            raise SettingIvarError(f'Ivar "{name}" does not exist in "{class_name}"')
+
+        ivar = ivars[i]
+        size = self.item_size
+        if i < len(ivars) - 1:
+            size = ivars[i + 1].offset - ivar.offset
+        with self.change_item_size(size):
+            self[ivar.offset // size] = value
+            ivar.value = value
 
     def _to_str(self, recursive=False):
         protocols_buf = f'<{",".join(self.class_.protocols)}>' if self.class_.protocols else ''
 
         if self.class_.super is not None:
-            buf = f'@interface {self.class_.name}: {self.class_.super.name} {protocols_buf}\n'
+            buf = [f'@interface {self.class_.name}: {self.class_.super.name} {protocols_buf}\n']
         else:
-            buf = f'@interface {self.class_.name} {protocols_buf}\n'
+            buf = [f'@interface {self.class_.name} {protocols_buf}\n']
 
         # Add ivars
-        buf += '{\n'
+        buf.append('{\n')
         for ivar in self.ivars:
-            buf += f'\t{ivar.type_} {ivar.name} = 0x{int(ivar.value):x}; // 0x{ivar.offset:x}\n'
-        buf += '}\n'
+            buf.append(f'\t{ivar.type_} {ivar.name} = 0x{int(ivar.value):x}; // 0x{ivar.offset:x}\n')
+        buf.append('}\n')
 
         # Add properties
         for prop in self.properties:
             attrs = prop.attributes
-            buf += f'@property ({",".join(attrs.list)}) {prop.attributes.type_} {prop.name};\n'
+            buf.append(f'@property ({",".join(attrs.list)}) {prop.attributes.type_} {prop.name};\n')
 
             if attrs.synthesize is not None:
-                buf += f'@synthesize {prop.name} = {attrs.synthesize};\n'
+                buf.append(f'@synthesize {prop.name} = {attrs.synthesize};\n')
 
         # Add methods
         methods = self.methods.copy()
 
         # Add super methods.
         if recursive:
+            seen = {method.name for method in methods}
             for sup in self.class_.iter_supers():
-                for method in filter(lambda m: m not in methods, sup.methods):
-                    methods.append(method)
+                for method in sup.methods:
+                    if method.name not in seen:
+                        seen.add(method.name)
+                        methods.append(method)
 
         # Print class methods first.
-        methods.sort(key=lambda m: not m.is_class)
-
-        for method in methods:
-            buf += str(method)
+        buf.extend(str(method) for method in methods if method.is_class)
+        buf.extend(str(method) for method in methods if not method.is_class)
 
-        buf += '@end'
-        return buf
+        buf.append('@end')
+        return ''.join(buf)
 
     @property
     def symbols_jar(self) -> SymbolsJar:
         """ Get a SymbolsJar object for quick operations on all methods """
-        jar = SymbolsJar.create(self._client)
-
-        for m in self.methods:
-            jar[m.name] = m.address
-
-        return jar
+        if self._symbols_jar is None:
+            jar = SymbolsJar.create(self._client)
+            for m in self.methods:
+                jar[m.name] = m.address
+            object.__setattr__(self, '_symbols_jar', jar)
+        # a copy, so callers modifying their jar don't modify the cached one
+        return self._symbols_jar.copy()
 
     def __dir__(self):
         result = set()
@@ -175,48 +191,48 @@ class ObjectiveCSymbol(Symbol):
             result.add(ivar.name)
 
         for method in self.methods:
-            result.add(method.name.replace(':', '_'))
+            result.add(method.python_name)
 
-        for sup in self.class_.iter_supers():
-            if self._client.configs.nsobject_exclusion and sup.name == 'NSObject':
-                continue
-            for method in sup.methods:
-                result.add(method.name.replace(':', '_'))
+        for method in self.class_._super_methods_by_name(self._client.configs.nsobject_exclusion).values():
+            result.add(method.python_name)
 
-        result.update(list(super(ObjectiveCSymbol, self).__dir__()))
+        result.update(super(ObjectiveCSymbol, self).__dir__())
         return list(result)
 
     def __getitem__(self, item):
-        if isinstance(item, int):
+        # only strings name ivars, properties or methods, anything else indexes the underlying memory
+        if not isinstance(item, str):
             return super(ObjectiveCSymbol, self).__getitem__(item)
 
         # Ivars
-        for ivar in self.ivars:
-            if ivar.name == item:
-                return ivar.value
+        ivar_index = self._ivars_by_name.get(item)
+        if ivar_index is not None:
+            return self.ivars[ivar_index].value
 
         # Properties
-        for prop in self.properties:
-            if prop.name == item:
-                return self.objc_call(item)
+        if item in self._properties_by_name:
+            return self.objc_call(item)
 
         # Methods
-        for method in self.methods:
-            if method.name == item:
-                return partial(self.class_.objc_call, item) if method.is_class else partial(self.objc_call, item)
-
-        for sup in self.class_.iter_supers():
-            for method in sup.methods:
-                if method.name == item:
-                    return partial(self.class_.objc_call, item) if method.is_class else partial(self.objc_call, item)
+        method = self.class_.get_method(item)
+        if method is None:
+            method = self.class_._super_methods_by_name().get(item)
+        if method is not None:
+            return partial(self.class_.objc_call, item) if method.is_class else partial(self.objc_call, item)
 
         raise AttributeError(f''''{self.class_.name}' has no attribute {item}''')
 
     def __getattr__(self, item: str):
-        return self[self.class_.sanitize_name(item)]
+        # ivars and properties are matched first, so resolving them never loads the super classes
+        ivar_index = self._ivars_by_name.get(item)
+        if ivar_index is not None:
+            return self.ivars[ivar_index].value
+        if item in self._properties_by_name:
+            return self.objc_call(item)
+        return self[self.class_._selector_for_python_name(item)]
 
     def __setitem__(self, key, value):
-        if isinstance(key, int):
+        if not isinstance(key, str):
             super(ObjectiveCSymbol, self).__setitem__(key, value)
             return
 
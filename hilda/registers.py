@@ -3,20 +3,25 @@ class Registers(object):
     Wrapper for more convenient access to modify current frame's registers
     """
 
+    __slots__ = ('_client', '_get_register', '_set_register')
+
     def __init__(self, client):
-        self.__dict__['_client'] = client
+        # bypass our own `__setattr__`, which writes registers
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_get_register', client.get_register)
+        object.__setattr__(self, '_set_register', client.set_register)
 
     def __getattr__(self, item):
-        return self._client.get_register(item)
+        return self._get_register(item)
 
     def __getitem__(self, item):
-        return self._client.get_register(item)
+        return self._get_register(item)
 
     def __setattr__(self, key, value):
-        return self._client.set_register(key, value)
+        return self._set_register(key, value)
 
     def __setitem__(self, key, value):
-        return self._client.set_register(key, value)
+        return self._set_register(key, value)
 
     def __dir__(self):
         result = []
@@ -1,26 +1,57 @@
+import atexit
+from binascii import hexlify
+from functools import partial
+
 from hilda.lldb_importer import lldb
 
 _FILENAME = '/tmp/hilda-keylog.txt'
+_VERBOSE = True
+# kept open while logging, unbuffered so every secret reaches the file as soon as it's logged
+_keylog_file = None
+
+# registers holding the (ssl, label, secret, secret_len) arguments of bssl::ssl_log_secret for each ABI
+_ARM64_ARGUMENT_REGISTERS = ('x0', 'x1', 'x2', 'x3')
+_X86_64_ARGUMENT_REGISTERS = ('rdi', 'rsi', 'rdx', 'rcx')
+
+
+def _close_keylog_file() -> None:
+    global _keylog_file
+
+    if _keylog_file is not None:
+        _keylog_file.close()
+        _keylog_file = None
+
+
+atexit.register(_close_keylog_file)
 
 
-def _ssl_log_secret_bp(hilda, *args):
-    label = hilda.registers.x1.peek_str()
-    secret = hilda.registers.x2.peek(hilda.registers.x3).hex()
-    random = (hilda.registers.x0[6] + 48).peek(32).hex()
-    print(f'ssl_log_secret\n'
-          f'    label: {label}\n'
-          f'    secret: {secret}\n'
-          f'    random: {random}\n'
-          f'---\n')
-    with open(_FILENAME, 'a') as f:
-        f.write(f'{label} {random} {secret}\n')
+def _ssl_log_secret_bp(argument_registers, hilda, *args):
+    ssl, label, secret, secret_len = (hilda.get_register(register) for register in argument_registers)
+    label = label.peek_str().encode()
+    secret = hexlify(secret.peek(secret_len))
+    random = hexlify((ssl[6] + 48).peek(32))
+    if _VERBOSE:
+        print(f'ssl_log_secret\n'
+              f'    label: {label.decode()}\n'
+              f'    secret: {secret.decode()}\n'
+              f'    random: {random.decode()}\n'
+              f'---\n')
+    _keylog_file.write(b'%s %s %s\n' % (label, random, secret))
     hilda.cont()
 
 
-def start_keylog(filename: str = None) -> None:
-    global _FILENAME
+def start_keylog(filename: str = None, verbose: bool = True) -> None:
+    global _FILENAME, _VERBOSE, _keylog_file
 
     if filename is not None:
         _FILENAME = filename
+    _VERBOSE = verbose
+    if _keylog_file is None or _keylog_file.name != _FILENAME:
+        _close_keylog_file()
+        _keylog_file = open(_FILENAME, 'ab', buffering=0)
     hilda_client = lldb.hilda_client
-    hilda_client.symbols._ZN4bssl14ssl_log_secretEPK6ssl_stPKcNS_4SpanIKhEE.bp(_ssl_log_secret_bp)
+    # the ABI can't change during the session, so pick the argument registers once
+    argument_registers = _X86_64_ARGUMENT_REGISTERS if hilda_client.arch.startswith('x86_64') \
+        else _ARM64_ARGUMENT_REGISTERS
+    hilda_client.symbols._ZN4bssl14ssl_log_secretEPK6ssl_stPKcNS_4SpanIKhEE.bp(
+        partial(_ssl_log_secret_bp, argument_registers))
@@ -1,17 +1,29 @@
+import json
+
 from hilda.objective_c_symbol import ObjectiveCSymbol
 
 
+def _iter_enumerator(symbol: ObjectiveCSymbol, enumerator_selector: str):
+    # collect all the items in a single expression instead of evaluating `nextObject` per item
+    client = symbol._client
+    with client.stopped():
+        pointers = json.loads(client.po(f'''
+        NSEnumerator *enumerator = [(id){symbol:d} {enumerator_selector}];
+        NSMutableArray *objectData = [NSMutableArray array];
+        id item;
+        while ((item = [enumerator nextObject])) {{
+            [objectData addObject:[NSNumber numberWithUnsignedLongLong:(unsigned long long)item]];
+        }}
+        NSData *data = [NSJSONSerialization dataWithJSONObject:objectData options:0 error:nil];
+        [[NSString alloc] initWithData:data encoding:NSUTF8StringEncoding];
+        '''))
+    for pointer in pointers:
+        yield client.symbol(pointer)
+
+
 def iter_values(symbol: ObjectiveCSymbol):
-    enum = symbol.objectEnumerator()
-    item = enum.nextObject()
-    while item != 0:
-        yield item
-        item = enum.nextObject()
+    yield from _iter_enumerator(symbol, 'objectEnumerator')
 
 
 def iter_keys(symbol: ObjectiveCSymbol):
-    enum = symbol.keyEnumerator()
-    item = enum.nextObject()
-    while item != 0:
-        yield item
-        item = enum.nextObject()
+    yield from _iter_enumerator(symbol, 'keyEnumerator')
@@ -1,19 +1,39 @@
-from cached_property import cached_property
+import struct
+from functools import lru_cache
 
 from hilda.lldb_importer import lldb
 from hilda.snippets.macho.all_image_infos import AllImageInfos
 from hilda.snippets.syslog import open_syslog_socket
 
+# dyld logging environment variables enabled by `enable_syslog()`
+SYSLOG_DYLD_OPTIONS = (
+    'DYLD_PRINT_APIS',
+    'DYLD_PRINT_APIS_APP',
+    'DYLD_PRINT_BINDINGS',
+    'DYLD_PRINT_DOFS',
+    'DYLD_PRINT_INITIALIZERS',
+    'DYLD_PRINT_INTERPOSING',
+    'DYLD_PRINT_LIBRARIES',
+    'DYLD_PRINT_LIBRARIES_POST_LAUNCH',
+    'DYLD_PRINT_NOTIFICATIONS',
+    'DYLD_PRINT_STATISTICS',
+    'DYLD_PRINT_STATISTICS_DETAILS',
+    'DYLD_PRINT_SEGMENTS',
+    'DYLD_PRINT_WEAK_BINDINGS',
+    'DYLD_PRINT_OPTS',
+    'DYLD_PRINT_WARNINGS',
+)
+
 
 def all_image_infos():
     return AllImageInfos()
 
 
-@cached_property
+@lru_cache(maxsize=None)
 def version():
+    # the loaded dyld can't change, so the target is only stopped for the first call
     with lldb.hilda_client.stopped(1):
-        return \
-            lldb.hilda_client.symbols.dyldVersionString.peek_str().decode('utf-8').split("PROJECT", 1)[1].split("\n")[0]
+        return lldb.hilda_client.symbols.dyldVersionString.peek_str().split("PROJECT", 1)[1].split("\n")[0]
 
 
 def enable_syslog():
@@ -25,35 +45,26 @@ def enable_syslog():
         client.symbols._ZZN4dyldL9useSyslogEvE12launchdOwned[0] = 1
         client.symbols._ZN4dyldL10sLogSocketE.item_size = 4
         client.symbols._ZN4dyldL10sLogSocketE[0] = 0xFFFFFFFF
-        options = (
-            'DYLD_PRINT_APIS',
-            'DYLD_PRINT_APIS_APP',
-            'DYLD_PRINT_BINDINGS'
-            'DYLD_PRINT_DOFS',
-            'DYLD_PRINT_INITIALIZERS',
-            'DYLD_PRINT_INTERPOSING',
-            'DYLD_PRINT_LIBRARIES',
-            'DYLD_PRINT_LIBRARIES_POST_LAUNCH',
-            'DYLD_PRINT_NOTIFICATIONS',
-            'DYLD_PRINT_STATSTICS'
-            'DYLD_PRINT_STATSTICS_DETAILS',
-            'DYLD_PRINT_SEGMENTS',
-            'DYLD_PRINT_WEAK_BINDINGS',
-            'DYLD_PRINT_OPTS',
-            'DYLD_PRINT_WARNINGS',
-        )
-
         open_syslog_socket()
 
-        with client.safe_malloc(8 * len(options) + 1) as envp:
-            for i, option in enumerate(options):
-                # enable for /usr/lib/dyld via dyld::processDyldEnvironmentVariable(option)
-                client.symbols._ZN4dyld30processDyldEnvironmentVariableEPKcS1_S1_(option)
-                variable = f'{option}=1'
-                envp[i] = client.symbols.malloc(len(option) + 10)
-                envp[i].poke(variable)
+        options = SYSLOG_DYLD_OPTIONS
+        for option in options:
+            # enable for /usr/lib/dyld via dyld::processDyldEnvironmentVariable(option)
+            client.symbols._ZN4dyld30processDyldEnvironmentVariableEPKcS1_S1_(option)
+
+        # place all the `OPTION=1` strings in a single allocation, written at once
+        variables = [f'{option}=1\0'.encode() for option in options]
+        variables_buf = client.symbols.malloc(sum(len(variable) for variable in variables))
+        variables_buf.poke(b''.join(variables))
+        envp_entries = []
+        offset = 0
+        for variable in variables:
+            envp_entries.append(variables_buf + offset)
+            offset += len(variable)
+        envp_entries.append(0)
 
-            envp[len(options)] = 0
+        with client.safe_malloc(8 * len(envp_entries)) as envp:
+            envp.poke(struct.pack(f'{client.endianness}{len(envp_entries)}Q', *envp_entries))
 
             # enable for libdyld.dylib via dyld::setLoggingFromEnvs(eng)
             client.symbols._ZN5dyld318setLoggingFromEnvsEPPKc(envp)
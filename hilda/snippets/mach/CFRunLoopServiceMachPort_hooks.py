@@ -1,6 +1,27 @@
+import struct
+from collections import namedtuple
+
 from hilda.exceptions import SymbolAbsentError
 from hilda.lldb_importer import lldb
 
+# `_disable_mach_msg_timeout` only patches within the first 200 bytes
+MACH_MSG_TIMEOUT_SCAN_SIZE = 200
+TRAP_MNEMONICS = frozenset(('brk', 'ud2'))
+# disassembly size used when a function's bounds are unknown to lldb
+DEFAULT_DISASSEMBLY_SIZE = 2000
+# `MOV Xd, Xm` is an alias of `ORR Xd, XZR, Xm`, with Rm placed at bits [20:16] and Rd at bits [4:0]
+ARM64_MOV_REGISTER = 0xAA0003E0
+ARM64_INSTRUCTION = struct.Struct('<I')
+ARM64_RM_SHIFT = 16
+ARM64_XZR = 31
+ARM64_MOV_X0_X0 = b'\xe0\x03\x00\xaa'
+
+# what `disable_mach_msg_errors` found in `__CFRunLoopServiceMachPort`. addresses are file addresses, so they remain
+# valid for every process that loads the same image
+MachPortScan = namedtuple('MachPortScan', 'while_ea trap_offsets timeout_patch')
+# scans by the UUID of the image containing `__CFRunLoopServiceMachPort`
+_scans = {}
+
 
 def _CFRunLoopServiceMachPort_hook(hilda, *args):
     """
@@ -10,23 +31,51 @@ def _CFRunLoopServiceMachPort_hook(hilda, *args):
     hilda.cont()
 
 
-def _disable_internal_error_handling() -> None:
+def _function_size(symbol) -> int:
+    """
+    Get the size in bytes of the function starting at the given symbol.
+    :param hilda.symbol.Symbol symbol: Function symbol.
+    """
+    lldb_symbol = symbol.lldb_symbol.symbol
+    if not lldb_symbol.IsValid():
+        return DEFAULT_DISASSEMBLY_SIZE
+    start = lldb_symbol.GetStartAddress().GetFileAddress()
+    end = lldb_symbol.GetEndAddress().GetFileAddress()
+    if end == lldb.LLDB_INVALID_ADDRESS or end <= start:
+        return DEFAULT_DISASSEMBLY_SIZE
+    return end - start
+
+
+def _apply_patches(hilda, patches) -> None:
+    """
+    Write the given patches, merging adjacent ones into a single write.
+    :param hilda.hilda_client.HildaClient hilda:
+    :param patches: Iterable of (address, code) tuples.
+    """
+    run_address = None
+    run = b''
+    for address, code in sorted(patches):
+        if run_address is not None and address == run_address + len(run):
+            run += code
+            continue
+        if run_address is not None:
+            hilda.poke(run_address, run)
+        run_address, run = address, code
+    if run_address is not None:
+        hilda.poke(run_address, run)
+
+
+def _disable_internal_error_handling(scan: MachPortScan) -> None:
     hilda = lldb.hilda_client
+    target = hilda.target
     with hilda.stopped():
-        instructions = hilda.symbols.__CFRunLoopServiceMachPort.disass(2000, should_print=False)
-        while_ea = None
-        for instruction in instructions:
-            if (while_ea is None) and instruction.DoesBranch():
-                # Beginning of the `while(true) { ... }`
-                while_ea = instruction.GetOperands(hilda.target)
-                hilda.CFRunLoopServiceMachPort_while_ea = int(hilda.file_symbol(eval(while_ea)))
-            elif instruction.GetMnemonic(hilda.target) in ('brk', 'ud2'):
-                symbol = hilda.symbol(instruction.addr.GetLoadAddress(hilda.target))
-                symbol.bp(
-                    _CFRunLoopServiceMachPort_hook,
-                    forced=True,
-                    name=f'__CFRunLoopServiceMachPort-brk-{int(symbol - hilda.symbols.__CFRunLoopServiceMachPort)}'
-                )
+        function_address = hilda.symbols.__CFRunLoopServiceMachPort
+        if scan.while_ea is not None:
+            hilda.CFRunLoopServiceMachPort_while_ea = int(hilda.file_symbol(scan.while_ea))
+        traps = [(int(function_address) + offset, {'name': f'__CFRunLoopServiceMachPort-brk-{offset}'})
+                 for offset in scan.trap_offsets]
+        # place all the trap breakpoints together, once they're all known
+        hilda.bulk_bp(traps, _CFRunLoopServiceMachPort_hook, forced=True)
 
     if hilda.arch == 'x86_64h':
         return
@@ -37,13 +86,12 @@ def _disable_internal_error_handling() -> None:
     except SymbolAbsentError:
         return
 
-    for instruction in handle_error.disass(2000, should_print=False):
-        if instruction.GetMnemonic(hilda.target) in ('brk', 'ud2'):
-            # mov x0, x0
-            hilda.symbol(instruction.addr.GetLoadAddress(hilda.target)).poke(b'\xe0\x03\x00\xaa')
+    instructions = handle_error.disass(_function_size(handle_error), should_print=False)
+    _apply_patches(hilda, [(instruction.addr.GetLoadAddress(target), ARM64_MOV_X0_X0) for instruction in instructions
+                           if instruction.GetMnemonic(target) in TRAP_MNEMONICS])
 
 
-def _disable_mach_msg_timeout() -> None:
+def _disable_mach_msg_timeout(scan: MachPortScan) -> None:
     """
     Remove the timeout validation from __CFRunLoopServiceMachPort. This is done by patching the mach_msg_timeout_t
     parameter (4rd one) to MACH_MSG_TIMEOUT_NONE. On arm the parameter passes on `x3` register.
@@ -69,26 +117,67 @@ def _disable_mach_msg_timeout() -> None:
         CoreFoundation:__text:0000000186E50150                 MOV             X22, X4
         CoreFoundation:__text:0000000186E50154                 MOV             X23, X3       <-------- Timeout parameter
     """
-    if not lldb.KEYSTONE_SUPPORT:
+    if scan.timeout_patch is None:
         return
 
     hilda = lldb.hilda_client
+    file_address, code = scan.timeout_patch
+    with hilda.stopped():
+        timeout_mov = hilda.file_symbol(file_address)
+        # an earlier session may have already patched this process
+        if timeout_mov.peek(len(code)) != code:
+            _apply_patches(hilda, [(int(timeout_mov), code)])
+
+
+def _find_mach_msg_timeout_patch(hilda, function):
+    """
+    Find the `MOV Xd, X3` saving the timeout parameter, and encode its `MOV Xd, XZR` replacement.
+    :return: Tuple of the instruction's file address and new encoding, or None if it wasn't found.
+    """
     if hilda.arch == 'x86_64h':
-        return
+        return None
 
-    with hilda.stopped():
-        for inst in hilda.symbols.__CFRunLoopServiceMachPort.disass(200, should_print=False):
-            mnemonic = inst.GetMnemonic(hilda.target)
-            operands = inst.GetOperands(hilda.target)
-            if mnemonic != 'mov' or not operands.endswith('x3'):
-                continue
-            addr = inst.GetAddress()
-            file_addr = addr.GetFileAddress()
-            new_inst = f'{mnemonic} {operands.replace("x3", "0")}'
-            hilda.file_symbol(file_addr).poke_text(new_inst)
-            break
+    # read the code once and match the encoding locally, instead of querying lldb for each disassembled instruction
+    # everything but Rd is fixed for `MOV Xd, X3`
+    mov_from_x3 = ARM64_MOV_REGISTER | (3 << ARM64_RM_SHIFT)
+    code = function.peek(MACH_MSG_TIMEOUT_SCAN_SIZE)
+    for index, (word,) in enumerate(ARM64_INSTRUCTION.iter_unpack(code)):
+        if (word & ~0x1F) == mov_from_x3:
+            # `MOV Xd, X3` -> `MOV Xd, XZR`, patched directly rather than re-assembled
+            word = (word & ~(0x1F << ARM64_RM_SHIFT)) | (ARM64_XZR << ARM64_RM_SHIFT)
+            return function.file_address + index * ARM64_INSTRUCTION.size, ARM64_INSTRUCTION.pack(word)
+    return None
+
+
+def _scan(function) -> MachPortScan:
+    hilda = lldb.hilda_client
+    target = hilda.target
+    instructions = function.disass(_function_size(function), should_print=False)
+    function_file_address = function.file_address
+    trap_offsets = []
+    while_ea = None
+    for instruction in instructions:
+        if (while_ea is None) and instruction.DoesBranch():
+            # Beginning of the `while(true) { ... }`
+            # the branch target is a plain immediate, possibly with an arm64 `#` prefix
+            while_ea = int(instruction.GetOperands(target).lstrip('#'), 0)
+        elif instruction.GetMnemonic(target) in TRAP_MNEMONICS:
+            trap_offsets.append(instruction.addr.GetFileAddress() - function_file_address)
+    return MachPortScan(while_ea, trap_offsets, _find_mach_msg_timeout_patch(hilda, function))
 
 
 def disable_mach_msg_errors() -> None:
-    _disable_mach_msg_timeout()
-    _disable_internal_error_handling()
+    hilda = lldb.hilda_client
+    with hilda.stopped():
+        function = hilda.symbols.__CFRunLoopServiceMachPort
+        # the instructions only change along with the image, so reuse its previous scan
+        image_uuid = function.lldb_symbol.module.GetUUIDString()
+        scan = _scans.get(image_uuid)
+        if scan is None:
+            scan = _scan(function)
+            # an already patched process no longer has the `MOV Xd, X3` to locate the timeout by, so its scan is only
+            # reused once another process provides it
+            if scan.timeout_patch is not None or hilda.arch == 'x86_64h':
+                _scans[image_uuid] = scan
+    _disable_mach_msg_timeout(scan)
+    _disable_internal_error_handling(scan)
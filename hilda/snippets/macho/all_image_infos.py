@@ -1,66 +1,131 @@
 import logging
+import struct
 
-from construct import Array, CString, Hex, If, Int32ub, Int32ul, Int64ul, Pointer, Struct, Tell, this
+from construct import Container, Hex, Int32ub, Int32ul, Int64ul, ListContainer, Struct, Tell
 from humanfriendly import prompts
 
+from hilda.exceptions import AccessingMemoryError
 from hilda.lldb_importer import lldb
-from hilda.snippets.macho.image_info import ImageInfo, dyld_image_info_t
-from hilda.snippets.macho.macho import mach_header_t
-from hilda.snippets.uuid import uuid_t
-from hilda.symbol import SymbolFormatField
+from hilda.snippets.macho.image_info import ImageInfo, pointer_t
+from hilda.snippets.macho.macho import parse_mach_header
+from hilda.snippets.uuid import iter_unpack_uuids, uuid_struct
 
 all_image_infos_t = Struct(
     'address' / Tell,
     'version' / Int32ul,
     'infoArrayCount' / Int32ul,
-    '_infoArray' / SymbolFormatField(lldb.hilda_client),
-    'infoArray' / Pointer(this._infoArray, Array(this.infoArrayCount, dyld_image_info_t)),
-    'notification' / SymbolFormatField(lldb.hilda_client),
+    # `infoArray` is read in bulk by `AllImageInfos.reload()` instead of entry by entry
+    '_infoArray' / pointer_t,
+    # the fields pointed by the rest of the pointers are only read once accessed through `AllImageInfos`
+    'notification' / pointer_t,
     'processDetachedFromSharedRegion' / Int32ub,
     'libSystemInitialized' / Int32ub,
-    '_dyldImageLoadAddress' / SymbolFormatField(lldb.hilda_client),
-    'dyldImageLoadAddress' / Pointer(this._dyldImageLoadAddress, mach_header_t),
-    'jitInfo' / SymbolFormatField(lldb.hilda_client),
-    '_dyldVersion' / SymbolFormatField(lldb.hilda_client),
-    'dyldVersion' / Pointer(this._dyldVersion, CString('utf8')),
-    '_errorMessage' / SymbolFormatField(lldb.hilda_client),
-    'errorMessage' / If(this._errorMessage != 0, Pointer(this._erroressage, CString('utf8'))),
+    '_dyldImageLoadAddress' / pointer_t,
+    'jitInfo' / pointer_t,
+    '_dyldVersion' / pointer_t,
+    '_errorMessage' / pointer_t,
     'terminationFlags' / Int64ul,
-    'coreSymbolicationShmPage' / SymbolFormatField(lldb.hilda_client),
+    'coreSymbolicationShmPage' / pointer_t,
     'systemOrderFlags' / Int64ul,
     'uuidArrayCount' / Int64ul,
-    '_uuidArray' / SymbolFormatField(lldb.hilda_client),
-    'uuidArray' / If(this._uuidArray != 0,
-                     Pointer(this._uuidArray, Array(this.uuidArrayCount, uuid_t))),
-    '_dyld_all_image_infos' / SymbolFormatField(lldb.hilda_client),
+    '_uuidArray' / pointer_t,
+    '_dyld_all_image_infos' / pointer_t,
     # 'dyld_all_image_infos' / Lazy(LazyBound(lambda: Pointer(this._dyld_all_image_infos, self.all_image_infos))),
     'initialImageCount' / Int64ul,
     'errorKind' / Int64ul,
-    '_errorClientOfDyLibPath' / SymbolFormatField(lldb.hilda_client),
-    'errorClientOfDyLibPath' / If(this._errorClientOfDyLibPath != 0,
-                                  Pointer(this._errorClientofoyLibPath, CString('utf8'))),
-    '_errorTargetDylibPath' / SymbolFormatField(lldb.hilda_client),
-    'errorTargetDylibPath' / If(this._errorTargetDylibPath != 0, Pointer(this._errorTargetDylibPath, CString('utf8'))),
-    '_errorSymbol' / SymbolFormatField(lldb.hilda_client),
-    'errorSymbol' / If(this._errorSymbol != 0, Pointer(this._errorSymbol, CString('utf8'))),
+    '_errorClientOfDyLibPath' / pointer_t,
+    '_errorTargetDylibPath' / pointer_t,
+    '_errorSymbol' / pointer_t,
     'sharedCacheSlide' / Hex(Int64ul),
 )
 
 
+# struct dyld_image_info { imageLoadAddress, imageFilePath, imageFileModDate }
+dyld_image_info_struct = struct.Struct('<QQQ')
+PATH_MAX = 1024
+# paths closer than this to one another are read together
+PATHS_READ_GAP = 0x4000
+
+
 class AllImageInfos(object):
     def reload(self):
-        with lldb.hilda_client.stopped(1):
-            all_image_infos_symbol = lldb.hilda_client.symbol(lldb.hilda_client.symbols.dyld_all_image_infos)
+        client = lldb.hilda_client
+        with client.stopped(1):
+            all_image_infos_symbol = client.symbol(client.symbols.dyld_all_image_infos)
             self.__all_image_infos = all_image_infos_t.parse_stream(all_image_infos_symbol)
-            self.__image_infos = []
+            self.__all_image_infos.infoArray = self.__read_info_array(client, self.__all_image_infos)
+            self.__dyld_mach_header = None
+            self.__image_infos = [ImageInfo(image_info_data) for image_info_data in self.__all_image_infos.infoArray]
+        self.__image_paths = [(image.file_path, image) for image in self.__image_infos]
+        self.__found_images = {}
+
+    @staticmethod
+    def __read_info_array(client, all_image_infos):
+        # a single memory read for the whole array, rather than one per field of each entry
+        info_array = client.peek(all_image_infos._infoArray,
+                                 all_image_infos.infoArrayCount * dyld_image_info_struct.size)
+        entries = list(dyld_image_info_struct.iter_unpack(info_array))
+        paths = AllImageInfos.__read_paths(client, [image_file_path for _, image_file_path, _ in entries])
+        image_infos_data = ListContainer()
+        # the pointers are kept as plain ints, as resolving a `Symbol` for each of them costs an lldb lookup
+        for image_load_address, image_file_path, image_file_mod_date in entries:
+            # the mach header is only parsed by `ImageInfo` once its load commands are needed
+            image_infos_data.append(Container(
+                _imageLoadAddress=image_load_address,
+                _imageFilePath=image_file_path,
+                imageFilePath=paths[image_file_path],
+                imageFileModDate=image_file_mod_date,
+            ))
+        return image_infos_data
 
-            for image_info_data in self.__all_image_infos.infoArray:
-                image_info = ImageInfo(image_info_data)
-                self.__image_infos.append(image_info)
+    @staticmethod
+    def __read_paths(client, addresses):
+        """
+        Read the paths at the given addresses. dyld keeps them close together, so each cluster of neighbouring paths
+        is read at once and split locally.
+        :return: Dictionary of the path at each address.
+        """
+        paths = {}
+        cluster = []
+        for address in sorted(set(addresses)):
+            if cluster and address - cluster[-1] > PATHS_READ_GAP:
+                AllImageInfos.__read_paths_cluster(client, cluster, paths)
+                cluster = []
+            cluster.append(address)
+        if cluster:
+            AllImageInfos.__read_paths_cluster(client, cluster, paths)
+        return paths
+
+    @staticmethod
+    def __read_paths_cluster(client, cluster, paths):
+        start = cluster[0]
+        err = lldb.SBError()
+        buf = client.process.ReadMemory(start, cluster[-1] - start + PATH_MAX, err)
+        for address in cluster:
+            offset = address - start
+            end = buf.find(b'\0', offset) if err.Success() else -1
+            if end == -1:
+                # the cluster's end isn't readable, or the path is longer than expected
+                paths[address] = AllImageInfos.__read_path(client, address)
+            else:
+                paths[address] = buf[offset:end].decode()
+
+    @staticmethod
+    def __read_path(client, address):
+        # a single read for the whole string, rather than one per character
+        err = lldb.SBError()
+        path = client.process.ReadCStringFromMemory(address, PATH_MAX, err)
+        if not err.Success():
+            raise AccessingMemoryError()
+        return path
 
     def __init__(self):
         self.__all_image_infos = None
         self.__image_infos = None
+        self.__dyld_mach_header = None
+        self.__image_paths = None
+        # `find_images` results by name, valid until the next `reload()`
+        self.__found_images = None
 
         self.reload()
 
@@ -68,8 +133,53 @@ class AllImageInfos(object):
     def images(self):
         return self.__image_infos
 
+    @property
+    def dyld_mach_header(self):
+        if self.__dyld_mach_header is None:
+            self.__dyld_mach_header = parse_mach_header(lldb.hilda_client, self.__all_image_infos._dyldImageLoadAddress)
+
+        return self.__dyld_mach_header
+
+    @property
+    def dyld_version(self):
+        return self.__read_string(self.__all_image_infos._dyldVersion)
+
+    @property
+    def uuid_array(self):
+        all_image_infos = self.__all_image_infos
+        if all_image_infos._uuidArray == 0:
+            return None
+        uuid_array = lldb.hilda_client.peek(all_image_infos._uuidArray, all_image_infos.uuidArrayCount * uuid_struct.size)
+        return list(iter_unpack_uuids(uuid_array))
+
+    @property
+    def error_message(self):
+        return self.__read_string(self.__all_image_infos._errorMessage)
+
+    @property
+    def error_client_of_dylib_path(self):
+        return self.__read_string(self.__all_image_infos._errorClientOfDyLibPath)
+
+    @property
+    def error_target_dylib_path(self):
+        return self.__read_string(self.__all_image_infos._errorTargetDylibPath)
+
+    @property
+    def error_symbol(self):
+        return self.__read_string(self.__all_image_infos._errorSymbol)
+
+    @staticmethod
+    def __read_string(address):
+        if address == 0:
+            return None
+        return AllImageInfos.__read_path(lldb.hilda_client, address)
+
     def find_images(self, name):
-        return [image for image in self.images if name in image.file_path]
+        images = self.__found_images.get(name)
+        if images is None:
+            images = [image for file_path, image in self.__image_paths if name in file_path]
+            self.__found_images[name] = images
+        return list(images)
 
     def image_dependencies(self, image_name):
         images = [image for image in self.find_images(image_name)]
@@ -89,9 +199,12 @@ class AllImageInfos(object):
     @staticmethod
     def __image_dependencies(images):
         unique_images = []
+        file_paths = set()
 
         for image in images:
-            if image.file_path not in [unique_image.file_path for unique_image in unique_images]:
+            file_path = image.file_path
+            if file_path not in file_paths:
+                file_paths.add(file_path)
                 unique_images.append(image)
 
         image = unique_images[0]
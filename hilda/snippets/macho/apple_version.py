@@ -1,7 +1,12 @@
-from construct import BitsInteger, BitStruct, Octet
+from collections import namedtuple
 
-version_t = BitStruct(
-    'major' / BitsInteger(16),
-    'minor' / Octet,
-    'bug' / Octet
-)
+from construct import Hex, Int32ul
+
+AppleVersion = namedtuple('AppleVersion', 'major minor bug')
+
+# a little-endian uint32 encoding X.Y.Z as 16 bits of major version, followed by 8 bits each of minor and bug
+version_t = Hex(Int32ul)
+
+
+def unpack_version(version: int) -> AppleVersion:
+    return AppleVersion(version >> 16, (version >> 8) & 0xff, version & 0xff)
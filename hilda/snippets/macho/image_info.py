@@ -1,42 +1,46 @@
-from construct import CString, If, Int64ul, Pointer, Struct, this
+from construct import Hex, Int64ul, Struct
 
 from hilda.lldb_importer import lldb
-from hilda.snippets.macho.macho import mach_header_t
+from hilda.snippets.macho.macho import parse_mach_header
 from hilda.snippets.macho.macho_load_commands import LoadCommands
 from hilda.snippets.uuid import uuid_t
-from hilda.symbol import SymbolFormatField
-
-dyld_image_info_t = Struct(
-    '_imageLoadAddress' / SymbolFormatField(lldb.hilda_client),
-    'imageLoadAddress' / Pointer(this._imageLoadAddress, mach_header_t),
-    '_imageFilePath' / SymbolFormatField(lldb.hilda_client),
-    'imageFilePath' / Pointer(this._imageFilePath, CString('utf8')),
-    'imageFileModDate' / Int64ul
-)
+
+# pointers are parsed as plain ints, as wrapping each of them in a `Symbol` costs an lldb lookup. what they point at is
+# only read once it's needed
+pointer_t = Hex(Int64ul)
 
 dyld_uuid_info_t = Struct(
-    '_imageLoadAddress' / SymbolFormatField(lldb.hilda_client),
-    'imageLoadAddress' / If(this._imageLoadAddress != 0, Pointer(this._imageLoadAddress,
-                                                                 mach_header_t)),
+    '_imageLoadAddress' / pointer_t,
     'imageUUID' / uuid_t
 )
 
 
 class ImageInfo(object):
+    # one is created per loaded image on every `AllImageInfos.reload()`
+    __slots__ = ('__image_info_data', '__file_path', '__image_mach_header', '__load_commands')
+
     def __init__(self, image_info_data):
         self.__image_info_data = image_info_data
         self.__file_path = image_info_data.imageFilePath
-        self.__image_mach_header = image_info_data.imageLoadAddress
+        self.__image_mach_header = None
         self.__load_commands = None
 
     @property
     def file_path(self):
         return self.__file_path
 
+    @property
+    def mach_header(self):
+        if self.__image_mach_header is None:
+            load_address = self.__image_info_data._imageLoadAddress
+            self.__image_mach_header = parse_mach_header(lldb.hilda_client, load_address)
+
+        return self.__image_mach_header
+
     @property
     def load_commands(self):
         if self.__load_commands is None:
-            self.__load_commands = LoadCommands(self.__image_mach_header.load_commands)
+            self.__load_commands = LoadCommands(self.mach_header.load_commands)
 
         return self.__load_commands
 
@@ -1,4 +1,8 @@
-from construct import Computed, Hex, Int32ul, LazyArray, Struct, Tell, this
+import os
+import struct
+from io import BytesIO
+
+from construct import Array, Computed, Hex, Int32ul, Struct, Tell, this
 
 from hilda.snippets.macho.macho_load_commands import LOAD_COMMAND_TYPE, load_command_t
 
@@ -20,6 +24,45 @@ mach_header_t = Struct(
     'sizeofcmds' / Hex(Int32ul),
     'flags' / Hex(Int32ul),
     'reserved' / Hex(Int32ul),
-    'load_commands' / LazyArray(this.ncmds, load_command_t),
+    # the load commands are already in memory and all of them end up parsed by `LoadCommands`, so they're parsed
+    # once in a row rather than through a `LazyArray`
+    'load_commands' / Array(this.ncmds, load_command_t),
     'aslr' / Computed(__calculate_aslr)
 )
+
+MACH_HEADER_64_SIZE = 32
+SIZEOFCMDS_OFFSET = 20
+
+
+class MemorySnapshot(object):
+    """
+    A construct stream over memory that was already read, still addressed by its load addresses
+    """
+
+    def __init__(self, address: int, buf: bytes):
+        self._address = int(address)
+        self._stream = BytesIO(buf)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            offset -= self._address
+        return self._stream.seek(offset, whence)
+
+    def read(self, count: int) -> bytes:
+        return self._stream.read(count)
+
+    def tell(self) -> int:
+        return self._address + self._stream.tell()
+
+
+def parse_mach_header(client, address: int):
+    """
+    Parse the mach header at the given address, reading it along with all of its load commands at once instead of
+    field by field.
+    :param hilda.hilda_client.HildaClient client: Hilda client.
+    :param address: Mach header address.
+    """
+    header = client.peek(address, MACH_HEADER_64_SIZE)
+    sizeofcmds, = struct.unpack_from('<I', header, SIZEOFCMDS_OFFSET)
+    load_commands = client.peek(address + MACH_HEADER_64_SIZE, sizeofcmds)
+    return mach_header_t.parse_stream(MemorySnapshot(address, header + load_commands))
@@ -1,11 +1,9 @@
 from typing import List
 
-from construct import Array, Bytes, Enum, Hex, Int8ul, Int32ul, Int64ul, PaddedString, Pointer, Seek, Struct, Switch, \
-    Tell, this
+from construct import Array, Bytes, Enum, Hex, Int8ul, Int32ul, Int64ul, PaddedString, Padding, Pointer, Seek, Struct, \
+    Switch, Tell, this
 
-from hilda.lldb_importer import lldb
-from hilda.snippets.macho.apple_version import version_t
-from hilda.symbol import SymbolFormatField
+from hilda.snippets.macho.apple_version import unpack_version, version_t
 
 # See: https://opensource.apple.com/source/xnu/xnu-7195.81.3/EXTERNAL_HEADERS/mach-o/loader.h
 LC_REQ_DYLD = 0x80000000
@@ -75,7 +73,8 @@ def __lc_str_from_load_command(this):
         # they would treat both the `ptr` and `offset` members as offsets (and never as pointers),
         # so we changed this a bit into the struct that it should have been
         'offset' / Hex(Int32ul),
-        '_pad' / Int32ul,
+        # skipped rather than parsed, as nothing reads it
+        Padding(4),
         'name' / Pointer(load_command._start + this.offset, PaddedString(load_command.cmdsize - this.offset, 'utf8')),
     )
 
@@ -95,7 +94,7 @@ __dylib_command_t = Struct(
 
 __segment_command_t = Struct(
     'segname' / PaddedString(16, 'utf8'),
-    'vmaddr' / SymbolFormatField(lldb.hilda_client),
+    'vmaddr' / Hex(Int64ul),
     'vmsize' / Int64ul,
     'fileoff' / Int64ul,
     'filesize' / Int64ul,
@@ -119,8 +118,8 @@ __build_version_command_t = Struct(
     'minos' / version_t,
     'sdk' / version_t,
     'ntools' / Int32ul,
-    # '_build_tools' / SymbolFormatField(this),
-    # 'build_tools' / If(this._build_tools != 0, Array(this.ntools, Pointer(this._build_tools, __build_tool_version)))
+    # the tools directly follow the command
+    'build_tools' / Array(this.ntools, __build_tool_version)
 )
 
 load_command_t = Struct(
@@ -140,6 +139,8 @@ load_command_t = Struct(
     }, Bytes(this.cmdsize - (this._data_offset - this._start))),
     Seek(this._start + this.cmdsize),
 )
+# every mach header parse goes through all of its load commands, so use construct's generated parser for them
+load_command_t = load_command_t.compile()
 
 
 class LoadCommand(object):
@@ -226,9 +227,9 @@ class BuildVersionCommand(LoadCommand):
         super(BuildVersionCommand, self).__init__(load_command_data)
 
         self.__platform = load_command_data.data.platform
-        self.__minos = load_command_data.data.platform
-        self.__sdk = load_command_data.data.platform
-        self.__ntools = load_command_data.data.platform
+        self.__minos = unpack_version(load_command_data.data.minos)
+        self.__sdk = unpack_version(load_command_data.data.sdk)
+        self.__ntools = load_command_data.data.ntools
         self.__build_tools = load_command_data.data.build_tools
 
     def __str__(self):
@@ -1,3 +1,6 @@
+import struct
+from collections import namedtuple
+
 from construct import Array, Int8ul, Int32ul, Int64ul, Struct
 
 uuid_t = Struct(
@@ -8,3 +11,12 @@ uuid_t = Struct(
     'clock_seq_low' / Int8ul,
     'node' / Array(6, Int8ul)
 )
+
+# the same layout as `uuid_t`, for decoding many of them without going through construct
+uuid_struct = struct.Struct('<QIIBB6B')
+Uuid = namedtuple('Uuid', 'time_low time_mid time_hi_and_version clock_seq_hi_and_reserved clock_seq_low node')
+
+
+def iter_unpack_uuids(buf: bytes):
+    for fields in uuid_struct.iter_unpack(buf):
+        yield Uuid(*fields[:5], fields[5:])
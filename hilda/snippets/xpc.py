@@ -10,6 +10,9 @@ from hilda.lldb_importer import lldb
 # module global for storing all active xpc connections
 active_xpc_connections = {}
 
+PYTHON_LEXER = PythonLexer()
+PYTHON_FORMATTER = TerminalTrueColorFormatter(style='native')
+
 
 def safe_monitor(symbol_name, **kwargs):
     hilda = lldb.hilda_client
@@ -81,7 +84,7 @@ def xpc_to_python_monitor_format(hilda_client, address):
     """
     try:
         formatted = pformat(from_xpc_object(address))
-        return highlight(formatted, PythonLexer(), TerminalTrueColorFormatter(style='native'))
+        return highlight(formatted, PYTHON_LEXER, PYTHON_FORMATTER)
     except ConvertingFromNSObjectError:
         return address.po()
 
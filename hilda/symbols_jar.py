@@ -64,6 +64,15 @@ class SymbolsJar(dict):
             retval[k] = v
         return retval
 
+    def copy(self):
+        """
+        Shallow copy of the jar, keeping it a SymbolsJar
+        :rtype: SymbolsJar
+        """
+        retval = SymbolsJar.create(self.__dict__['_client'])
+        retval.update(self)
+        return retval
+
     def bp(self, callback=None, **args):
         """
         Place a breakpoint on all symbols in current jar.
@@ -157,17 +166,7 @@ class SymbolsJar(dict):
         :param case_sensitive: is case sensitive
         :return: reduced symbol jar
         """
-        if not case_sensitive:
-            exp = exp.lower()
-
-        retval = SymbolsJar.create(self.__dict__['_client'])
-        for k, v in self.items():
-            orig_k = k
-            if not case_sensitive:
-                k = k.lower()
-            if k.startswith(exp):
-                retval[orig_k] = v
-        return retval
+        return self._filter_names(str.startswith, exp, case_sensitive)
 
     def endswith(self, exp, case_sensitive=True):
         """
@@ -176,17 +175,7 @@ class SymbolsJar(dict):
         :param case_sensitive: is case sensitive
         :return: reduced symbol jar
         """
-        if not case_sensitive:
-            exp = exp.lower()
-
-        retval = SymbolsJar.create(self.__dict__['_client'])
-        for k, v in self.items():
-            orig_k = k
-            if not case_sensitive:
-                k = k.lower()
-            if k.endswith(exp):
-                retval[orig_k] = v
-        return retval
+        return self._filter_names(str.endswith, exp, case_sensitive)
 
     def find(self, exp, case_sensitive=True):
         """
@@ -195,14 +184,21 @@ class SymbolsJar(dict):
         :param case_sensitive: is case sensitive
         :return: reduced symbol jar
         """
-        if not case_sensitive:
-            exp = exp.lower()
+        return self._filter_names(str.__contains__, exp, case_sensitive)
 
+    def _filter_names(self, match, exp, case_sensitive):
+        """
+        Filter symbols whose name satisfies `match(name, exp)`.
+        The case sensitivity check is resolved once instead of per symbol.
+        """
         retval = SymbolsJar.create(self.__dict__['_client'])
-        for k, v in self.items():
-            orig_k = k
-            if not case_sensitive:
-                k = k.lower()
-            if exp in k:
-                retval[orig_k] = v
+        if case_sensitive:
+            for k, v in self.items():
+                if match(k, exp):
+                    retval[k] = v
+        else:
+            exp = exp.lower()
+            for k, v in self.items():
+                if match(k.lower(), exp):
+                    retval[k] = v
         return retval
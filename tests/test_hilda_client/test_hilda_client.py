@@ -38,3 +38,17 @@ def test_lsof(hilda_client):
     finally:
         hilda_client.symbols.close(file_handle)
         hilda_client.symbols.unlink(file_path)
+
+
+def test_bulk_bp(hilda_client):
+    """
+    :param hilda.hilda_client.HildaClient hilda_client: Hilda client.
+    """
+    breakpoints = hilda_client.bulk_bp([(hilda_client.symbols.malloc, {'name': 'malloc'}),
+                                        (hilda_client.symbols.free, {})], stop=True)
+    try:
+        assert [bp.options for bp in breakpoints] == [{'stop': True, 'name': 'malloc'}, {'stop': True}]
+        assert all(bp.lldb_breakpoint.id in hilda_client.breakpoints for bp in breakpoints)
+    finally:
+        for bp in breakpoints:
+            bp.remove()
@@ -0,0 +1,40 @@
+import struct
+from types import SimpleNamespace
+
+import pytest
+
+from hilda.snippets.mach.CFRunLoopServiceMachPort_hooks import _find_mach_msg_timeout_patch
+
+FUNCTION_FILE_ADDRESS = 0x186e5012c
+SUB_SP_SP_0X70 = 0xd101c3ff
+MOV_X19_XZR = 0xaa1f03f3
+MOV_X22_X4 = 0xaa0403f6
+MOV_X23_X3 = 0xaa0303f7
+MOV_X23_XZR = 0xaa1f03f7
+
+
+def _function(*words):
+    code = struct.pack(f'<{len(words)}I', *words)
+    return SimpleNamespace(file_address=FUNCTION_FILE_ADDRESS, peek=lambda size: code[:size])
+
+
+@pytest.mark.parametrize('words, index', [
+    ((SUB_SP_SP_0X70, MOV_X22_X4, MOV_X23_X3), 2),
+    # the timeout mov is preferred over an earlier `MOV Xd, XZR`
+    ((MOV_X23_XZR, MOV_X22_X4, MOV_X23_X3), 2),
+])
+def test_find_mach_msg_timeout_patch(words, index):
+    hilda = SimpleNamespace(arch='arm64e')
+    assert _find_mach_msg_timeout_patch(hilda, _function(*words)) == (FUNCTION_FILE_ADDRESS + index * 4,
+                                                                      struct.pack('<I', MOV_X23_XZR))
+
+
+@pytest.mark.parametrize('arch, words', [
+    ('arm64e', (SUB_SP_SP_0X70, MOV_X22_X4)),
+    # already patched by an earlier session, the unrelated `MOV X19, XZR` mustn't be taken for the timeout
+    ('arm64e', (SUB_SP_SP_0X70, MOV_X22_X4, MOV_X23_XZR)),
+    ('arm64e', (MOV_X19_XZR, MOV_X22_X4, MOV_X23_XZR)),
+    ('x86_64h', (SUB_SP_SP_0X70, MOV_X23_X3)),
+])
+def test_find_mach_msg_timeout_patch_not_found(arch, words):
+    assert _find_mach_msg_timeout_patch(SimpleNamespace(arch=arch), _function(*words)) is None
@@ -0,0 +1,12 @@
+import pytest
+
+from hilda.snippets.macho.apple_version import AppleVersion, unpack_version
+
+
+@pytest.mark.parametrize('version, expected', [
+    (0x000e0500, AppleVersion(14, 5, 0)),
+    (0x000f0201, AppleVersion(15, 2, 1)),
+    (0x03ff0a0b, AppleVersion(1023, 10, 11)),
+])
+def test_unpack_version(version, expected):
+    assert unpack_version(version) == expected
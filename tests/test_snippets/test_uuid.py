@@ -0,0 +1,20 @@
+from hilda.snippets.uuid import Uuid, iter_unpack_uuids, uuid_struct, uuid_t
+
+
+def test_iter_unpack_uuids_matches_uuid_t():
+    buf = bytes(range(uuid_struct.size * 2))
+    uuids = list(iter_unpack_uuids(buf))
+    assert len(uuids) == 2
+    for index, uuid in enumerate(uuids):
+        expected = uuid_t.parse(buf[index * uuid_struct.size:(index + 1) * uuid_struct.size])
+        assert uuid == Uuid(expected.time_low, expected.time_mid, expected.time_hi_and_version,
+                            expected.clock_seq_hi_and_reserved, expected.clock_seq_low, tuple(expected.node))
+
+
+def test_iter_unpack_uuids_fields():
+    uuid, = iter_unpack_uuids(bytes(range(uuid_struct.size)))
+    assert uuid.time_low == 0x0706050403020100
+    assert uuid.time_mid == 0x0b0a0908
+    assert uuid.time_hi_and_version == 0x0f0e0d0c
+    assert (uuid.clock_seq_hi_and_reserved, uuid.clock_seq_low) == (0x10, 0x11)
+    assert uuid.node == (0x12, 0x13, 0x14, 0x15, 0x16, 0x17)
@@ -55,6 +55,8 @@ def test_getting_super_class_method(hilda_client):
     ('T@,R,&,VidReadonlyRetainNonatomic',
      PropertyAttributes(synthesize='idReadonlyRetainNonatomic', type_='id', list=['readonly', 'strong'])),
     ('T^v', PropertyAttributes(synthesize=None, type_='void *', list=[])),
+    ('Tq,N,GisEnabled,V_enabled',
+     PropertyAttributes(synthesize='_enabled', type_='long long', list=['nonatomic', 'getter=isEnabled'])),
 ])
 def test_convert_encoded_property_attributes(encoded: str, result: PropertyAttributes):
     """